@@ -9,6 +9,7 @@ import logging
 import argparse
 import operator
 import sys
+import uvloop
 from wazuh.cluster import control, cluster
 
 
@@ -164,6 +165,8 @@ if __name__ == '__main__':
             parser.print_help()
             sys.exit(0)
 
+        # the event loop policy must be set before asyncio.run creates the loop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         asyncio.run(my_function(*my_args))
     except KeyboardInterrupt:
         pass
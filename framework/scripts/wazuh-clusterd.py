@@ -9,6 +9,7 @@ import argparse
 import os
 import sys
 import time
+import uvloop
 from wazuh.cluster import cluster, __version__, __author__, __ossec_name__, __licence__, master, local_server, worker
 from wazuh import common, configuration, pyDaemonModule, Wazuh
 
@@ -179,6 +180,8 @@ if __name__ == '__main__':
     pyDaemonModule.create_pid('wazuh-clusterd', os.getpid())
 
     main_function = master_main if cluster_configuration['node_type'] == 'master' else worker_main
+    # the event loop policy must be set before asyncio.run creates the loop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     try:
         asyncio.run(main_function(args, cluster_configuration, cluster_items, main_logger))
     except KeyboardInterrupt:
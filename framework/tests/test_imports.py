@@ -78,6 +78,7 @@ import boto3
 import botocore
 import cryptography.fernet
 import docker
+import orjson
 import pytz
 import requests
 import uvloop
@@ -70,8 +70,6 @@ class AbstractClientManager:
         Starts the client: connect to the server and wait until the connection is closed.
         :return: None
         """
-        # Get a reference to the event loop as we plan to use low-level APIs.
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         self.loop.set_exception_handler(common.asyncio_exception_handler)
         on_con_lost = self.loop.create_future()
         ssl_context = ssl.create_default_context(purpose=ssl.Purpose.CLIENT_AUTH) if self.ssl else None
@@ -17,11 +17,55 @@ import os
 import time
 import copy
 from wazuh.exception import WazuhException
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(obj, default=None, indent=None) -> str:
+    """
+    Serializes an object to a JSON formatted str. orjson is used if it's available since it's much faster than the
+    json module. The json module is used for indented output and for objects orjson is not able to serialize (e.g.
+    integers wider than 64 bits). Unlike the json module, orjson serializes NaN and Infinity as null.
+
+    :param obj: Object to serialize
+    :param default: Function called for objects that can't be serialized otherwise
+    :param indent: Indentation level
+    :return: JSON formatted str
+    """
+    if orjson is not None and indent is None:
+        try:
+            return orjson.dumps(obj, default=default,
+                                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj=obj, default=default, indent=indent)
+
+
+def loads(s: str):
+    """
+    Deserializes a JSON formatted str. orjson is used if it's available, falling back to the json module for
+    documents orjson doesn't accept (e.g. NaN values). Unlike the json module, orjson decodes integers wider than
+    64 bits as float.
+
+    :param s: JSON formatted str
+    :return: Deserialized object
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except ValueError:
+            pass
+    return json.loads(s)
+
 
 class DistributedAPI:
     """
     Represents a distributed API request
     """
+    __slots__ = ('logger', 'input_json', 'node', 'cluster_items', 'node_info', 'debug', 'pretty', 'request_id')
+
     def __init__(self, input_json: Dict, logger: logging.Logger, node: c_common.Handler = None, debug: bool = False,
                  pretty: bool = False):
         """
@@ -129,7 +173,7 @@ class DistributedAPI:
                 self.print_json(error=1000, data="Wazuh-Python Internal Error: data encoding unknown ({})".format(e))
 
         output = {'message' if error else 'data': data, 'error': error}
-        return json.dumps(obj=output, default=encode_json, indent=4 if self.pretty else None)
+        return dumps(output, default=encode_json, indent=4 if self.pretty else None)
 
     async def execute_local_request(self) -> str:
         """
@@ -139,22 +183,21 @@ class DistributedAPI:
         """
         def run_local(args):
             self.logger.debug("Starting to execute request locally")
-            data = rq.functions[self.input_json['function']]['function'](**args)
+            data = request_function['function'](**args)
             self.logger.debug("Finished executing request locally")
             return data
         try:
             before = time.time()
 
-            self.check_wazuh_status(basic_services=rq.functions[self.input_json['function']].get('basic_services',
-                                                                                                 None)
-                                    )
+            request_function = rq.functions[self.input_json['function']]
+            self.check_wazuh_status(basic_services=request_function.get('basic_services', None))
 
             timeout = None if self.input_json['arguments']['wait_for_complete'] \
                 else self.cluster_items['intervals']['communication']['timeout_api_exe']
             local_args = copy.deepcopy(self.input_json['arguments'])
             del local_args['wait_for_complete']  # local requests don't use this parameter
 
-            if rq.functions[self.input_json['function']]['is_async']:
+            if request_function['is_async']:
                 task = run_local(local_args)
             else:
                 loop = asyncio.get_running_loop()
@@ -166,7 +209,7 @@ class DistributedAPI:
                 raise exception.WazuhException(3021)
 
             after = time.time()
-            self.logger.debug("Time calculating request result: {}s".format(after - before))
+            self.logger.debug("Time calculating request result: %ss", after - before)
             return self.print_json(data=data, error=0)
         except exception.WazuhException as e:
             if self.debug:
@@ -194,7 +237,7 @@ class DistributedAPI:
         """
         if 'tmp_file' in self.input_json['arguments']:
             await self.send_tmp_file()
-        return await self.node.execute(command=b'dapi', data=json.dumps(self.input_json).encode(),
+        return await self.node.execute(command=b'dapi', data=dumps(self.input_json).encode(),
                                        wait_for_complete=self.input_json['arguments']['wait_for_complete'])
 
     async def forward_request(self):
@@ -222,17 +265,19 @@ class DistributedAPI:
                 if 'tmp_file' in self.input_json['arguments']:
                     await self.send_tmp_file(node_name)
                 response = await self.node.execute(b'dapi_forward',
-                                                   "{} {}".format(node_name, json.dumps(self.input_json)).encode(),
+                                                   "{} {}".format(node_name, dumps(self.input_json)).encode(),
                                                    self.input_json['arguments']['wait_for_complete'])
             return response
 
-        # get the node(s) who has all available information to answer the request.
-        nodes = self.get_solver_node()
+        # get the node(s) who has all available information to answer the request. Since it queries the global
+        # database, it's run in an executor so other requests can be processed meanwhile.
+        loop = asyncio.get_running_loop()
+        nodes = await loop.run_in_executor(None, self.get_solver_node)
         self.input_json['from_cluster'] = True
         if len(nodes) > 1:
-            results = map(json.loads, await asyncio.shield(asyncio.gather(*[forward(node) for node in nodes.items()])))
+            results = map(loads, await asyncio.shield(asyncio.gather(*[forward(node) for node in nodes.items()])))
             final_json = {}
-            response = json.dumps(self.merge_results(results, final_json))
+            response = dumps(self.merge_results(results, final_json))
         else:
             response = await forward(next(iter(nodes.items())))
         return response
@@ -245,18 +290,18 @@ class DistributedAPI:
         :return: node name and whether the result is list or not
         """
         select_node = {'fields': ['node_name']}
-        if 'agent_id' in self.input_json['arguments']:
+        arguments = self.input_json['arguments']
+        if 'agent_id' in arguments:
             # the request is for multiple agents
-            if isinstance(self.input_json['arguments']['agent_id'], list):
+            if isinstance(arguments['agent_id'], list):
                 agents = agent.Agent.get_agents_overview(select=select_node, limit=None,
-                                                         filters={'id': self.input_json['arguments']['agent_id']},
+                                                         filters={'id': arguments['agent_id']},
                                                          sort={'fields': ['node_name'], 'order': 'desc'})['items']
                 node_name = {k: list(map(operator.itemgetter('id'), g)) for k, g in
                              itertools.groupby(agents, key=operator.itemgetter('node_name'))}
 
                 # add non existing ids in the master's dictionary entry
-                non_existent_ids = list(set(self.input_json['arguments']['agent_id']) -
-                                        set(map(operator.itemgetter('id'), agents)))
+                non_existent_ids = list(set(arguments['agent_id']) - set(map(operator.itemgetter('id'), agents)))
                 if non_existent_ids:
                     if self.node_info['node'] in node_name:
                         node_name[self.node_info['node']].extend(non_existent_ids)
@@ -267,20 +312,19 @@ class DistributedAPI:
             # if the request is only for one agent
             else:
                 # Get the node where the agent 'agent_id' is reporting
-                node_name = agent.Agent.get_agent(self.input_json['arguments']['agent_id'],
-                                                  select=select_node)['node_name']
-                return {node_name: [self.input_json['arguments']['agent_id']]}
+                node_name = agent.Agent.get_agent(arguments['agent_id'], select=select_node)['node_name']
+                return {node_name: [arguments['agent_id']]}
 
-        elif 'node_id' in self.input_json['arguments']:
-            node_id = self.input_json['arguments']['node_id']
-            del self.input_json['arguments']['node_id']
+        elif 'node_id' in arguments:
+            node_id = arguments['node_id']
+            del arguments['node_id']
             return {node_id: []}
-        elif 'group_id' in self.input_json['arguments']:
+        elif 'group_id' in arguments:
             agents = agent.Agent.get_agents_overview(
-                select=select_node, filters={'group': self.input_json['arguments']['group_id']})['items']
+                select=select_node, filters={'group': arguments['group_id']})['items']
             if len(agents) == 0:
                 raise WazuhException(1751)
-            del self.input_json['arguments']['group_id']
+            del arguments['group_id']
             node_name = {k: list(map(operator.itemgetter('id'), g)) for k, g in
                          itertools.groupby(agents, key=operator.itemgetter('node_name'))}
 
@@ -341,17 +385,17 @@ class DistributedAPI:
                         final_json[key] = field
 
         if 'data' in final_json and 'items' in final_json['data'] and isinstance(final_json['data']['items'], list):
-            if 'offset' not in self.input_json['arguments']:
-                self.input_json['arguments']['offset'] = 0
-            if 'limit' not in self.input_json['arguments']:
-                self.input_json['arguments']['limit'] = common.database_limit
+            arguments = self.input_json['arguments']
+            if 'offset' not in arguments:
+                arguments['offset'] = 0
+            if 'limit' not in arguments:
+                arguments['limit'] = common.database_limit
 
-            if 'sort' in self.input_json['arguments']:
-                final_json['data']['items'] = utils.sort_array(final_json['data']['items'],
-                                                               self.input_json['arguments']['sort']['fields'],
-                                                               self.input_json['arguments']['sort']['order'])
+            if 'sort' in arguments:
+                final_json['data']['items'] = utils.sort_array(final_json['data']['items'], arguments['sort']['fields'],
+                                                               arguments['sort']['order'])
 
-            offset, limit = self.input_json['arguments']['offset'], self.input_json['arguments']['limit']
+            offset, limit = arguments['offset'], arguments['limit']
             final_json['data']['items'] = final_json['data']['items'][offset:offset+limit]
 
         if 'error' in final_json and final_json['error'] > 0 and 'data' in final_json:
@@ -362,14 +406,19 @@ class DistributedAPI:
 
 class APIRequestQueue:
     """
-    Represents a queue of API requests. This thread will be always in background, it will remain blocked until a
-    request is pushed into its request_queue. Then, it will answer the request and get blocked again.
+    Represents a queue of API requests. This task will be always in background, it will remain blocked until a
+    request is pushed into its request_queue. Then, it will start answering the request in a new task and wait for
+    the next one. At most cluster_items['distributed_api']['max_concurrent_requests'] requests are answered at the
+    same time.
     """
     def __init__(self, server):
         self.request_queue = asyncio.Queue()
         self.server = server
         self.logger = logging.getLogger('wazuh')
         self.pending_requests = {}
+        self.semaphore = asyncio.Semaphore(server.cluster_items['distributed_api']['max_concurrent_requests'])
+        # references to the running tasks so they aren't garbage collected before finishing
+        self.tasks = set()
 
     async def run(self):
         cluster.context_tag.set('Cluster')
@@ -379,26 +428,54 @@ class APIRequestQueue:
             # id      -> id of the request.
             # request -> JSON containing request's necessary information
             names, request = (await self.request_queue.get()).split(' ', 1)
-            request = json.loads(request)
-            names = names.split('*', 1)
-            name_2 = '' if len(names) == 1 else names[1] + ' '
+            # requests are answered concurrently so a slow request doesn't delay the ones received after it
+            await self.semaphore.acquire()
+            task = asyncio.create_task(self.process_request(names, request))
+            self.tasks.add(task)
+            task.add_done_callback(self.request_done)
+
+    def request_done(self, task: asyncio.Task):
+        """
+        Releases the resources used by a finished request task.
+
+        :param task: Finished task
+        """
+        self.tasks.discard(task)
+        self.semaphore.release()
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.error("Error in distributed API: {}".format(task.exception()))
+
+    async def process_request(self, names: str, request: str):
+        """
+        Answers a request from the queue and sends the response back to the node that made it.
+
+        :param names: Node name the request came from, followed by the original client name if any.
+        :param request: JSON containing request's necessary information
+        """
+        names = names.split('*', 1)
+        name_2 = '' if len(names) == 1 else names[1] + ' '
+        try:
             node = self.server.client if names[0] == 'master' else self.server.clients[names[0]]
+        except KeyError:
+            self.logger.error("Error in distributed API: node {} is not connected".format(names[0]))
+            return
+        try:
+            request = loads(request)
             self.logger.info("Receiving request: {} from {}".format(
                 request['function'], names[0] if not name_2 else '{} ({})'.format(names[0], names[1])))
-            try:
-                result = await DistributedAPI(input_json=request, logger=self.logger, node=node).distribute_function()
-                task_id = await node.send_string(result.encode())
-            except Exception as e:
-                self.logger.error("Error in distributed API: {}".format(e))
-                task_id = b'Error in distributed API: ' + str(e).encode()
-
-            if task_id.startswith(b'Error'):
-                self.logger.error(task_id.decode())
-                result = await node.send_request(b'dapi_err', name_2.encode() + task_id, b'dapi_err')
-            else:
-                result = await node.send_request(b'dapi_res', name_2.encode() + task_id, b'dapi_err')
-            if result.startswith(b'Error'):
-                self.logger.error(result.decode())
+            result = await DistributedAPI(input_json=request, logger=self.logger, node=node).distribute_function()
+            task_id = await node.send_string(result.encode())
+        except Exception as e:
+            self.logger.error("Error in distributed API: {}".format(e))
+            task_id = b'Error in distributed API: ' + str(e).encode()
+
+        if task_id.startswith(b'Error'):
+            self.logger.error(task_id.decode())
+            result = await node.send_request(b'dapi_err', name_2.encode() + task_id, b'dapi_err')
+        else:
+            result = await node.send_request(b'dapi_res', name_2.encode() + task_id, b'dapi_err')
+        if result.startswith(b'Error'):
+            self.logger.error(result.decode())
 
     def add_request(self, request: bytes):
         """
@@ -406,5 +483,5 @@ class APIRequestQueue:
 
         :param request: Request to add
         """
-        self.logger.debug("Received request: {}".format(request))
+        self.logger.debug("Received request: %s", request)
         self.request_queue.put_nowait(request.decode())
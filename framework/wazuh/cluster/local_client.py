@@ -6,7 +6,6 @@ import logging
 from typing import Tuple
 
 from wazuh.cluster import client, cluster
-import uvloop
 from wazuh import common, exception
 
 
@@ -39,7 +38,7 @@ class LocalClientHandler(client.AbstractClient):
         :param data: Received payload
         :return: A response
         """
-        self.logger.debug("Command received: {}".format(command))
+        self.logger.debug("Command received: %s", command)
         if command == b'dapi_res' or command == b'send_f_res':
             if data.startswith(b'Error'):
                 return b'err', self.process_error_from_peer(data)
@@ -106,7 +105,6 @@ class LocalClient(client.AbstractClientManager):
         """
         # Get a reference to the event loop as we plan to use
         # low-level APIs.
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         loop = asyncio.get_running_loop()
         on_con_lost = loop.create_future()
 
@@ -6,7 +6,6 @@ import json
 import random
 from typing import Tuple, Union
 
-import uvloop
 from wazuh import common, exception
 from wazuh.cluster import server, common as c_common, client
 from wazuh.cluster.dapi import dapi
@@ -122,7 +121,6 @@ class LocalServer(server.AbstractServer):
         """
         # Get a reference to the event loop as we plan to use
         # low-level APIs.
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         loop = asyncio.get_running_loop()
         loop.set_exception_handler(c_common.asyncio_exception_handler)
 
@@ -241,7 +239,7 @@ class LocalServerHandlerWorker(LocalServerHandler):
         #modify logger filter tag in LocalServerHandlerWorker entry point
         context_tag.set("Local " + self.name)
 
-        self.logger.debug2("Command received: {}".format(command))
+        self.logger.debug2("Command received: %s", command)
         if command == b'dapi':
             api_call_name = json.loads(data.decode())['function']
             if api_call_name not in {'/cluster/nodes', '/cluster/nodes/:node_name', '/cluster/healthcheck'}:
@@ -3,9 +3,9 @@
 # This program is free software; you can redistribute it and/or modify it under the terms of GPLv2
 import asyncio
 import json
-import random
 import re
 import shutil
+import uuid
 from calendar import timegm
 from datetime import datetime
 import functools
@@ -165,7 +165,7 @@ class MasterHandler(server.AbstractServerHandler, c_common.WazuhCommon):
         :param data: received payload
         :return: response
         """
-        self.logger.debug("Command received: {}".format(command))
+        self.logger.debug("Command received: %s", command)
         if command == b'sync_i_w_m_p' or command == b'sync_e_w_m_p' or command == b'sync_a_w_m_p':
             return self.get_permission(command)
         elif command == b'sync_i_w_m' or command == b'sync_e_w_m' or command == b'sync_a_w_m':
@@ -183,6 +183,9 @@ class MasterHandler(server.AbstractServerHandler, c_common.WazuhCommon):
             return self.process_dapi_cluster(data)
         elif command == b'dapi_err':
             dapi_client, error_msg = data.split(b' ', 1)
+            if dapi_client.decode() in self.server.pending_api_requests:
+                return self.set_api_response(dapi_client.decode(),
+                                             json.dumps({'error': 3009, 'message': error_msg.decode()}))
             asyncio.create_task(self.server.local_server.clients[dapi_client.decode()].send_request(command, error_msg,
                                                                                                     command))
             return b'ok', b'DAPI error forwarded to worker'
@@ -205,36 +208,54 @@ class MasterHandler(server.AbstractServerHandler, c_common.WazuhCommon):
         :param wait_for_complete: Raise a timeout exception or not
         :return: The request response
         """
-        request_id = str(random.randint(0, 2**10 - 1))
-        # create an event to wait for the response
-        self.server.pending_api_requests[request_id] = {'Event': asyncio.Event(), 'Response': ''}
-
-        if command == b'dapi_forward':
-            client, request = data.split(b' ', 1)
-            client = client.decode()
-            if client == 'fw_all_nodes':
-                for worker in self.server.clients.values():
-                    result = (await worker.send_request(b'dapi', request_id.encode() + b' ' + request)).decode()
-            elif client in self.server.clients:
-                result = (await self.server.clients[client].send_request(b'dapi', request_id.encode() + b' ' + request)).decode()
+        # requests are answered concurrently, so IDs must never repeat. Late responses to a previous request could be
+        # taken as the response of a new one otherwise.
+        request_id = uuid.uuid4().hex
+        # create an event to wait for the response. Pending is the number of responses still expected and Done is set
+        # once this method returns.
+        self.server.pending_api_requests[request_id] = {'Event': asyncio.Event(), 'Response': '', 'Pending': 0,
+                                                        'Done': False}
+
+        try:
+            if command == b'dapi_forward':
+                client, request = data.split(b' ', 1)
+                client = client.decode()
+                if client == 'fw_all_nodes':
+                    # send the request to all workers at the same time instead of waiting for each one of them to answer
+                    results = await asyncio.gather(*[worker.send_request(b'dapi', request_id.encode() + b' ' + request)
+                                                     for worker in self.server.clients.values()])
+                    results = [r.decode() for r in results]
+                    # a response is expected from every worker the request has been sent to
+                    self.server.pending_api_requests[request_id]['Pending'] += sum(not r.startswith('Error')
+                                                                                   for r in results)
+                    result = next((r for r in results if r.startswith('Error')), results[-1])
+                elif client in self.server.clients:
+                    result = (await self.server.clients[client].send_request(b'dapi', request_id.encode() + b' ' + request)).decode()
+                    if not result.startswith('Error'):
+                        self.server.pending_api_requests[request_id]['Pending'] += 1
+                else:
+                    raise WazuhException(3022, client)
             else:
-                raise WazuhException(3022, client)
-        else:
-            result = (await self.send_request(b'dapi', request_id.encode() + b' ' + data)).decode()
+                result = (await self.send_request(b'dapi', request_id.encode() + b' ' + data)).decode()
+                if command == b'dapi' and not result.startswith('Error'):
+                    self.server.pending_api_requests[request_id]['Pending'] += 1
 
-        if result.startswith('Error'):
-            request_result = json.dumps({'error': 3009, 'message': result})
-        else:
-            if command == b'dapi' or command == b'dapi_forward':
-                try:
-                    timeout = None if wait_for_complete \
-                                   else self.cluster_items['intervals']['communication']['timeout_api_request']
-                    await asyncio.wait_for(self.server.pending_api_requests[request_id]['Event'].wait(), timeout=timeout)
-                    request_result = self.server.pending_api_requests[request_id]['Response']
-                except asyncio.TimeoutError:
-                    request_result = json.dumps({'error': 3000, 'message': 'Timeout exceeded'})
+            if result.startswith('Error'):
+                request_result = json.dumps({'error': 3009, 'message': result})
             else:
-                request_result = result
+                if command == b'dapi' or command == b'dapi_forward':
+                    try:
+                        timeout = None if wait_for_complete \
+                                       else self.cluster_items['intervals']['communication']['timeout_api_request']
+                        await asyncio.wait_for(self.server.pending_api_requests[request_id]['Event'].wait(), timeout=timeout)
+                        request_result = self.server.pending_api_requests[request_id]['Response']
+                    except asyncio.TimeoutError:
+                        request_result = json.dumps({'error': 3000, 'message': 'Timeout exceeded'})
+                else:
+                    request_result = result
+        finally:
+            self.finish_api_request(request_id)
+
         return request_result
 
     def hello(self, data: bytes) -> Tuple[bytes, bytes]:
@@ -271,6 +292,37 @@ class MasterHandler(server.AbstractServerHandler, c_common.WazuhCommon):
         """
         return self.server
 
+    def finish_api_request(self, request_id: str):
+        """
+        Marks a pending API request as finished. It's removed once no more responses are expected for it, so late
+        responses (e.g. the remaining workers of a fw_all_nodes request or responses received after a timeout) are
+        discarded instead of being handled as responses for an unknown request.
+
+        :param request_id: ID of the request
+        """
+        pending_request = self.server.pending_api_requests[request_id]
+        pending_request['Done'] = True
+        if pending_request['Pending'] <= 0:
+            del self.server.pending_api_requests[request_id]
+
+    def set_api_response(self, request_id: str, response: str) -> Tuple[bytes, bytes]:
+        """
+        Sets the response of a pending API request, or discards it if the request has already finished.
+
+        :param request_id: ID of the request
+        :param response: Response received from a worker
+        :return: confirmation message
+        """
+        pending_request = self.server.pending_api_requests[request_id]
+        pending_request['Pending'] -= 1
+        if pending_request['Done']:
+            if pending_request['Pending'] <= 0:
+                del self.server.pending_api_requests[request_id]
+            return b'ok', b'Response discarded, request already finished'
+        pending_request['Response'] = response
+        pending_request['Event'].set()
+        return b'ok', b'Forwarded response'
+
     def process_dapi_res(self, data: bytes) -> Tuple[bytes, bytes]:
         """
         Processes a DAPI response coming from a worker node. This function is called when the master received a
@@ -283,9 +335,7 @@ class MasterHandler(server.AbstractServerHandler, c_common.WazuhCommon):
         req_id, string_id = data.split(b' ', 1)
         req_id = req_id.decode()
         if req_id in self.server.pending_api_requests:
-            self.server.pending_api_requests[req_id]['Response'] = self.in_str[string_id].payload.decode()
-            self.server.pending_api_requests[req_id]['Event'].set()
-            return b'ok', b'Forwarded response'
+            return self.set_api_response(req_id, self.in_str[string_id].payload.decode())
         elif req_id in self.server.local_server.clients:
             asyncio.create_task(self.forward_dapi_response(data))
             return b'ok', b'Response forwarded to worker'
@@ -4,7 +4,6 @@ import asyncio
 import itertools
 import operator
 import ssl
-import uvloop
 import time
 from wazuh.cluster import common as c_common, cluster
 from wazuh import common, exception, utils
@@ -279,10 +278,7 @@ class AbstractServer:
         """
         Starts the server and the infinite asynchronous tasks
         """
-        # Get a reference to the event loop as we plan to use
-        # low-level APIs.
         cluster.context_tag.set(self.tag)
-        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
         self.loop.set_exception_handler(c_common.asyncio_exception_handler)
 
         if self.enable_ssl:
@@ -0,0 +1,190 @@
+# Copyright (C) 2015-2019, Wazuh Inc.
+# Created by Wazuh, Inc. <info@wazuh.com>.
+# This program is free software; you can redistribute it and/or modify it under the terms of GPLv2
+
+import asyncio
+import json
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+with patch('wazuh.common.ossec_uid'):
+    with patch('wazuh.common.ossec_gid'):
+        from wazuh.cluster.dapi import dapi
+
+import pytest
+
+
+@pytest.mark.parametrize('orjson', [dapi.orjson, None])
+@pytest.mark.parametrize('obj', [
+    {'data': {'items': [{'id': '001', 'name': 'agent'}], 'totalItems': 1}, 'error': 0},
+    {'data': 2**70 + 1},
+    {'data': 'ñ'}
+])
+def test_dumps(orjson, obj):
+    """
+    Checks dumps returns the same object when it's decoded, both with and without orjson
+    """
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        assert json.loads(dapi.dumps(obj)) == obj
+
+
+@pytest.mark.parametrize('orjson', [dapi.orjson, None])
+def test_dumps_default(orjson):
+    """
+    Checks the default function is used for objects that can't be serialized otherwise
+    """
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        assert json.loads(dapi.dumps({'data': {1, 2}}, default=sorted)) == {'data': [1, 2]}
+        assert json.loads(dapi.dumps({'date': datetime(2019, 1, 1)}, default=str)) == {'date': '2019-01-01 00:00:00'}
+
+
+@pytest.mark.parametrize('orjson', [dapi.orjson, None])
+def test_dumps_indent(orjson):
+    """
+    Checks indented output is the same one the json module returns
+    """
+    obj = {'data': {'items': [1, 2]}, 'error': 0}
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        assert dapi.dumps(obj, indent=4) == json.dumps(obj, indent=4)
+
+
+@pytest.mark.parametrize('orjson, expected', [
+    (dapi.orjson, '{"data":null}'),
+    (None, '{"data": NaN}')
+])
+def test_dumps_nan(orjson, expected):
+    """
+    Checks NaN values are serialized as null by orjson and as NaN by the json module
+    """
+    if orjson is None and expected == '{"data":null}':
+        pytest.skip("orjson is not installed")
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        assert dapi.dumps({'data': float('nan')}) == expected
+
+
+@pytest.mark.parametrize('orjson', [dapi.orjson, None])
+def test_loads(orjson):
+    """
+    Checks loads returns the deserialized object, both with and without orjson
+    """
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        assert dapi.loads('{"data": {"items": ["001"]}, "error": 0}') == {'data': {'items': ['001']}, 'error': 0}
+
+
+@pytest.mark.parametrize('orjson, expected_type', [
+    (dapi.orjson, float),
+    (None, int)
+])
+def test_loads_wide_int(orjson, expected_type):
+    """
+    Checks integers wider than 64 bits are decoded as float by orjson and as int by the json module
+    """
+    if orjson is None and expected_type is float:
+        pytest.skip("orjson is not installed")
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        loaded = dapi.loads('{{"data": {}}}'.format(2**70 + 1))
+    assert type(loaded['data']) is expected_type
+    assert loaded['data'] == pytest.approx(2**70 + 1)
+
+
+@pytest.mark.parametrize('orjson', [dapi.orjson, None])
+def test_loads_nan(orjson):
+    """
+    Checks documents with NaN values, which orjson doesn't accept, are deserialized by the json module
+    """
+    with patch('wazuh.cluster.dapi.dapi.orjson', orjson):
+        loaded = dapi.loads('{"data": NaN}')
+    assert loaded['data'] != loaded['data']
+
+
+class ServerMock:
+    """
+    Master or worker using an APIRequestQueue
+    """
+    def __init__(self, max_concurrent_requests=2):
+        self.cluster_items = {'distributed_api': {'max_concurrent_requests': max_concurrent_requests}}
+        self.clients = {}
+        self.client = None
+
+
+async def process_requests(request_queue, requests, process_request=None):
+    """
+    Adds the requests to the queue and waits until they have all been answered. If process_request is given, it's
+    used to answer them.
+
+    :return: Number of requests that have been answered
+    """
+    answered = 0
+    original_process_request = process_request or request_queue.process_request
+
+    async def count_request(names, request):
+        nonlocal answered
+        try:
+            await original_process_request(names, request)
+        finally:
+            answered += 1
+
+    with patch.object(request_queue, 'process_request', count_request):
+        task = asyncio.create_task(request_queue.run())
+        for request in requests:
+            request_queue.add_request(request)
+        while answered < len(requests) or request_queue.tasks:
+            await asyncio.sleep(0)
+        task.cancel()
+    return answered
+
+
+def test_api_request_queue_concurrency():
+    """
+    Checks no more than max_concurrent_requests requests are answered at the same time
+    """
+    running, max_running = 0, 0
+
+    async def process_request(names, request):
+        nonlocal running, max_running
+        running += 1
+        max_running = max(running, max_running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def run():
+        request_queue = dapi.APIRequestQueue(server=ServerMock(max_concurrent_requests=2))
+        assert await process_requests(request_queue, [b'worker1 {}'] * 5, process_request) == 5
+
+    asyncio.run(run())
+    assert max_running == 2
+
+
+def test_api_request_queue_failed_request():
+    """
+    Checks the exception of a failed request is logged and the request doesn't keep its slot
+    """
+    async def process_request(names, request):
+        raise ValueError('error')
+
+    async def run():
+        request_queue = dapi.APIRequestQueue(server=ServerMock(max_concurrent_requests=1))
+        request_queue.logger = MagicMock()
+        assert await process_requests(request_queue, [b'worker1 {}'] * 3, process_request) == 3
+        assert request_queue.logger.error.call_count == 3
+        request_queue.logger.error.assert_called_with("Error in distributed API: error")
+
+    asyncio.run(run())
+
+
+def test_api_request_queue_unknown_node():
+    """
+    Checks requests from a node that isn't connected anymore are dropped
+    """
+    async def run():
+        server = ServerMock()
+        server.clients = {'worker1': MagicMock()}
+        request_queue = dapi.APIRequestQueue(server=server)
+        request_queue.logger = MagicMock()
+        with patch('wazuh.cluster.dapi.dapi.DistributedAPI') as dapi_mock:
+            assert await process_requests(request_queue, [b'worker2 {"function": "/agents"}']) == 1
+        dapi_mock.assert_not_called()
+        server.clients['worker1'].send_request.assert_not_called()
+        request_queue.logger.error.assert_called_once_with("Error in distributed API: node worker2 is not connected")
+
+    asyncio.run(run())
@@ -0,0 +1,179 @@
+# Copyright (C) 2015-2019, Wazuh Inc.
+# Created by Wazuh, Inc. <info@wazuh.com>.
+# This program is free software; you can redistribute it and/or modify it under the terms of GPLv2
+
+import asyncio
+import json
+from unittest.mock import patch, MagicMock
+
+with patch('wazuh.common.ossec_uid'):
+    with patch('wazuh.common.ossec_gid'):
+        from wazuh.cluster import master
+
+import pytest
+
+cluster_items = {'intervals': {'communication': {'timeout_api_request': 0.1}}}
+
+
+class WorkerMock:
+    """
+    Worker connection that answers the DAPI requests the master sends to it
+    """
+    def __init__(self, handler, name, result=b'Added request to API requests queue'):
+        self.handler = handler
+        self.name = name
+        self.result = result
+        self.requests = []
+
+    async def send_request(self, command, data):
+        self.requests.append(data.split(b' ', 1)[0])
+        return self.result
+
+    def reply(self, response='{"error": 0}', request=-1):
+        """
+        Sends the dapi_res command to the master, the same way a worker does once the request has been answered
+        """
+        string_id = self.name.encode() + str(len(self.handler.in_str)).encode()
+        self.handler.in_str[string_id] = MagicMock(payload=response.encode())
+        return self.handler.process_request(b'dapi_res', self.requests[request] + b' ' + string_id)
+
+
+def get_handler(workers=0, **kwargs):
+    server = MagicMock(pending_api_requests={}, local_server=MagicMock(clients={}))
+    handler = master.MasterHandler(server=server, loop=None, fernet_key='', logger=MagicMock(),
+                                   cluster_items=cluster_items)
+    handler.logger = MagicMock()
+    server.clients = {'worker{}'.format(i): WorkerMock(handler, 'worker{}'.format(i), **kwargs)
+                      for i in range(workers)}
+    return handler
+
+
+async def wait_for_requests(handler, n):
+    while sum(len(worker.requests) for worker in handler.server.clients.values()) < n:
+        await asyncio.sleep(0)
+
+
+def test_execute_unique_request_ids():
+    """
+    Checks concurrent requests get different IDs and each one of them receives its own response
+    """
+    async def run():
+        handler = get_handler(workers=1)
+        worker = handler.server.clients['worker0']
+        requests = [asyncio.create_task(handler.execute(b'dapi_forward', b'worker0 {}', False)) for _ in range(3)]
+        await wait_for_requests(handler, 3)
+        assert len(set(worker.requests)) == 3
+        for i in range(3):
+            worker.reply('{{"data": {}}}'.format(i), request=i)
+        assert [json.loads(r) for r in await asyncio.gather(*requests)] == [{'data': 0}, {'data': 1}, {'data': 2}]
+        assert handler.server.pending_api_requests == {}
+
+    asyncio.run(run())
+
+
+def test_execute_late_responses():
+    """
+    Checks a fw_all_nodes request is kept until every worker has answered and the responses received after the
+    request has finished are discarded, not handled as responses for an unknown request
+    """
+    async def run():
+        handler = get_handler(workers=3)
+        workers = list(handler.server.clients.values())
+        request = asyncio.create_task(handler.execute(b'dapi_forward', b'fw_all_nodes {}', True))
+        await wait_for_requests(handler, 3)
+        assert len({worker.requests[0] for worker in workers}) == 1
+
+        assert workers[0].reply() == (b'ok', b'Forwarded response')
+        assert await request == '{"error": 0}'
+        request_id = workers[0].requests[0].decode()
+        assert handler.server.pending_api_requests[request_id]['Pending'] == 2
+
+        assert workers[1].reply() == (b'ok', b'Response discarded, request already finished')
+        assert request_id in handler.server.pending_api_requests
+        assert workers[2].reply() == (b'ok', b'Response discarded, request already finished')
+        assert handler.server.pending_api_requests == {}
+        handler.logger.error.assert_not_called()
+
+    asyncio.run(run())
+
+
+
+@pytest.mark.parametrize('results, expected', [
+    ([b'ok', b'ok', b'ok'], {'error': 0}),
+    ([b'ok', b'Error sending request to worker1', b'Error sending request to worker2'],
+     {'error': 3009, 'message': 'Error sending request to worker1'}),
+    ([b'Error sending request to worker0', b'ok', b'ok'],
+     {'error': 3009, 'message': 'Error sending request to worker0'}),
+])
+def test_execute_fw_all_nodes(results, expected):
+    """
+    Checks fw_all_nodes requests are sent to every worker with the same request ID, the first error is returned if
+    the request couldn't be sent to any of them and responses are expected only from the workers it was sent to
+    """
+    async def run():
+        handler = get_handler(workers=3)
+        workers = list(handler.server.clients.values())
+        for worker, result in zip(workers, results):
+            worker.result = result
+        answering_workers = [worker for worker in workers if worker.result == b'ok']
+
+        request = asyncio.create_task(handler.execute(b'dapi_forward', b'fw_all_nodes {}', True))
+        await wait_for_requests(handler, 3)
+        request_id = workers[0].requests[0]
+        assert all(worker.requests == [request_id] for worker in workers)
+        if len(answering_workers) == len(workers):
+            answering_workers.pop(0).reply()
+        assert json.loads(await request) == expected
+
+        assert handler.server.pending_api_requests[request_id.decode()]['Pending'] == len(answering_workers)
+        for worker in answering_workers:
+            assert worker.reply() == (b'ok', b'Response discarded, request already finished')
+        assert handler.server.pending_api_requests == {}
+
+    asyncio.run(run())
+
+def test_execute_timeout():
+    """
+    Checks a response received after the request has timed out is discarded
+    """
+    async def run():
+        handler = get_handler(workers=1)
+        worker = handler.server.clients['worker0']
+        assert json.loads(await handler.execute(b'dapi_forward', b'worker0 {}', False)) == \
+            {'error': 3000, 'message': 'Timeout exceeded'}
+        assert len(handler.server.pending_api_requests) == 1
+        assert worker.reply() == (b'ok', b'Response discarded, request already finished')
+        assert handler.server.pending_api_requests == {}
+        handler.logger.error.assert_not_called()
+
+    asyncio.run(run())
+
+
+def test_execute_dapi_err():
+    """
+    Checks an error sent by a worker with the dapi_err command is returned as the request response
+    """
+    async def run():
+        handler = get_handler(workers=1)
+        worker = handler.server.clients['worker0']
+        request = asyncio.create_task(handler.execute(b'dapi_forward', b'worker0 {}', True))
+        await wait_for_requests(handler, 1)
+        assert handler.process_request(b'dapi_err', worker.requests[0] + b' Error in distributed API: error') == \
+            (b'ok', b'Forwarded response')
+        assert json.loads(await request) == {'error': 3009, 'message': 'Error in distributed API: error'}
+        assert handler.server.pending_api_requests == {}
+
+    asyncio.run(run())
+
+
+def test_execute_unknown_worker():
+    """
+    Checks the request is removed if the worker it must be sent to isn't connected
+    """
+    async def run():
+        handler = get_handler()
+        with pytest.raises(master.WazuhException, match='.* 3022 .*'):
+            await handler.execute(b'dapi_forward', b'worker0 {}', False)
+        assert handler.server.pending_api_requests == {}
+
+    asyncio.run(run())
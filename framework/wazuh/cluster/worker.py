@@ -135,7 +135,7 @@ class WorkerHandler(client.AbstractClient, c_common.WazuhCommon):
         :param data: Payload received
         :return: A response
         """
-        self.logger.debug("Command received: '{}'".format(command))
+        self.logger.debug("Command received: '%s'", command)
         if command == b'sync_m_c_ok':
             return self.sync_integrity_ok_from_master()
         elif command == b'sync_m_c':
@@ -215,18 +215,22 @@ class WazuhException(Exception):
         """
         self.code = code
         if not cmd_error:
+            try:
+                code_message = self.ERRORS[code]
+            except KeyError:
+                raise WazuhException(1000, f"Unknown error code {code}") from None
             if extra_message:
                 if isinstance(extra_message, dict):
-                    self.message = self.ERRORS[code].format(**extra_message)
+                    self.message = code_message.format(**extra_message)
                 else:
-                    self.message = "{0}: {1}".format(self.ERRORS[code], extra_message)
+                    self.message = f"{code_message}: {extra_message}"
             else:
-                self.message = self.ERRORS[code]
+                self.message = code_message
         else:
             self.message = extra_message
 
     def __str__(self):
-        return "Error {0} - {1}".format(self.code, self.message)
+        return f"Error {self.code} - {self.message}"
 
     def to_dict(self):
         return {'error': self.code, 'message': self.message}
@@ -30,6 +30,7 @@ from wazuh.exception import WazuhException
 from wazuh.utils import previous_month, cut_array, sort_array, search_array, tail, load_wazuh_xml, safe_move
 
 _re_logtest = re.compile(r"^.*(?:ERROR: |CRITICAL: )(?:\[.*\] )?(.*)$")
+_re_ossec_log = re.compile(r"^(\d\d\d\d/\d\d/\d\d\s\d\d:\d\d:\d\d)\s(\S+)(?:\[.*)?:\s(DEBUG|INFO|CRITICAL|ERROR|WARNING):(.*)$")
 execq_lockfile = join(common.ossec_path, "var", "run", ".api_execq_lock")
 
 
@@ -44,9 +45,7 @@ def status() -> Dict:
 
 
 def __get_ossec_log_fields(log):
-    regex_category = re.compile(r"^(\d\d\d\d/\d\d/\d\d\s\d\d:\d\d:\d\d)\s(\S+)(?:\[.*)?:\s(DEBUG|INFO|CRITICAL|ERROR|WARNING):(.*)$")
-
-    match = re.search(regex_category, log)
+    match = _re_ossec_log.match(log)
 
     if match:
         date = match.group(1)
@@ -60,7 +59,11 @@ def __get_ossec_log_fields(log):
     else:
         return None
 
-    return datetime.strptime(date, '%Y/%m/%d %H:%M:%S'), category, type_log.lower(), description
+    # the regex has already checked the 'YYYY/MM/DD HH:MM:SS' format, which is much faster to slice than strptime
+    log_date = datetime(int(date[0:4]), int(date[5:7]), int(date[8:10]),
+                        int(date[11:13]), int(date[14:16]), int(date[17:19]))
+
+    return log_date, category, type_log.lower(), description
 
 
 def ossec_log(months=3, offset=0, limit=common.database_limit, sort=None, search=None, filters={}, q=''):
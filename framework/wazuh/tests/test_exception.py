@@ -0,0 +1,35 @@
+# Copyright (C) 2015-2019, Wazuh Inc.
+# Created by Wazuh, Inc. <info@wazuh.com>.
+# This program is free software; you can redistribute it and/or modify it under the terms of GPLv2
+
+import pytest
+
+from wazuh.exception import WazuhException
+
+
+@pytest.mark.parametrize('code, extra_message, cmd_error, expected_message', [
+    (1000, None, False, 'Wazuh Internal Error'),
+    (1000, 'extra', False, 'Wazuh Internal Error: extra'),
+    (1017, {'node_name': 'master', 'not_ready_daemons': 'wazuh-db->stopped'}, False,
+     "Some Wazuh daemons are not ready in node 'master' (wazuh-db->stopped)"),
+    (9999, 'Custom command error', True, 'Custom command error')
+])
+def test_wazuh_exception(code, extra_message, cmd_error, expected_message):
+    """
+    Tests the message of a WazuhException is built from its code and extra message
+    """
+    exc = WazuhException(code, extra_message=extra_message, cmd_error=cmd_error)
+
+    assert exc.code == code
+    assert exc.message == expected_message
+    assert str(exc) == f'Error {code} - {expected_message}'
+    assert exc.to_dict() == {'error': code, 'message': expected_message}
+
+
+def test_wazuh_exception_unknown_code():
+    """
+    Tests an unknown error code raises a Wazuh Internal Error instead of a KeyError
+    """
+    with pytest.raises(WazuhException, match=r'Error 1000 - Wazuh Internal Error: Unknown error code 9999') as e:
+        WazuhException(9999)
+    assert e.value.__suppress_context__
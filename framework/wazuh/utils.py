@@ -26,6 +26,19 @@ import sys
 if sys.version_info[0] == 3:
     unicode = str
 
+_re_timeframe = re.compile(r'(\d+)(\w)')
+_re_query_elements = re.compile(r'([\w\-.]+)(=|!=|<|>|~)([\w\-.]+)')  # regex for getting elements in a clause
+_re_date = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+# regex used by WazuhDBQuery to turn a query into SQL. See WazuhDBQuery.__init__
+_re_db_query = re.compile(
+    r'(\()?' +                  # A ( character.
+    r'([\w.]+)' +               # Field name: name of the field to look on DB
+    r'([=!<>~]{1,2})' +         # Operator: looks for =, !=, <, > or ~.
+    r"([\w _\-\.:/']+)" +       # Value: A string.
+    r"(\))?" +                  # A ) character
+    r"([,;])?"                  # Separator: looks for ;, , or nothing.
+)
+
 try:
     from subprocess import check_output
 except ImportError:
@@ -633,9 +646,9 @@ def get_timeframe_in_seconds(timeframe):
         if 'h' not in timeframe and 'd' not in timeframe and 'm' not in timeframe and 's' not in timeframe:
             raise WazuhException(1411, timeframe)
 
-        regex, seconds = re.compile(r'(\d+)(\w)'), 0
+        seconds = 0
         time_equivalence_seconds = {'d': 86400, 'h': 3600, 'm': 60, 's':1}
-        for time, unit in regex.findall(timeframe):
+        for time, unit in _re_timeframe.findall(timeframe):
             # it's not necessarry to check whether the unit is in the dictionary, because it's been validated before.
             seconds += int(time) * time_equivalence_seconds[unit]
     else:
@@ -681,8 +694,6 @@ def filter_array_by_query(q: str, input_array: typing.List) -> typing.List:
             value2 = int(value2) if type(value1) == int else value2
             return operators[op](value1, value2)
 
-    # compile regular expression only one time when function is called
-    re_get_elements = re.compile(r'([\w\-.]+)(=|!=|<|>|~)([\w\-.]+)')  # regex for getting elements in a clause
     # get a list with OR clauses
     or_clauses = q.split(',')
     output_array = []
@@ -695,7 +706,7 @@ def filter_array_by_query(q: str, input_array: typing.List) -> typing.List:
             match = True  # flag for checking clauses
             for and_clause in and_clauses:
                 # get elements in a clause
-                field_name, op, value = re_get_elements.match(and_clause).groups()
+                field_name, op, value = _re_query_elements.match(and_clause).groups()
                 # check if a clause is satisfied
                 if field_name in elem and check_clause(elem[field_name], op, value):
                    continue
@@ -823,15 +834,8 @@ class WazuhDBQuery(object):
         #   (name != wazuh ;
         #    id   > 5      ),
         #    group=webserver
-        self.query_regex = re.compile(
-            r'(\()?' +                                                     # A ( character.
-            r'([\w.]+)' +                                                  # Field name: name of the field to look on DB
-            '([' + ''.join(self.query_operators.keys()) + "]{1,2})" +      # Operator: looks for =, !=, <, > or ~.
-            r"([\w _\-\.:/']+)" +                                          # Value: A string.
-            r"(\))?" +                                                     # A ) character
-            "([" + ''.join(self.query_separators.keys())+"])?"             # Separator: looks for ;, , or nothing.
-        )
-        self.date_regex = re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+        self.query_regex = _re_db_query
+        self.date_regex = _re_date
         self.date_fields = date_fields
         self.extra_fields = extra_fields
         self.q = query